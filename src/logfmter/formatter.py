@@ -1,10 +1,9 @@
-import io
 import logging
 import numbers
+import re
 import traceback
-from contextlib import closing
 from types import TracebackType
-from typing import Dict, List, Optional, Tuple, Type, cast
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Type, cast
 
 ExcInfo = Tuple[Type[BaseException], BaseException, TracebackType]
 
@@ -38,6 +37,27 @@ RESERVED: Tuple[str, ...] = (
     "threadName",
 )
 
+# A set of the reserved attributes for constant time membership checks.
+_RESERVED: FrozenSet[str] = frozenset(RESERVED)
+
+# Sentinel used to detect log record attributes which do not exist.
+_MISSING = object()
+
+# Translation table used to escape double quotes and newlines in a single pass.
+_ESCAPE = str.maketrans({'"': '\\"', "\n": "\\n"})
+
+# Translation table used to normalize keys in a single pass.
+_KEY_ESCAPE = str.maketrans({" ": "_", "\n": "\\n"})
+
+# Preformatted strings for common integers such as counters and status codes.
+_SMALL_INT_STR: Dict[int, str] = {i: str(i) for i in range(-128, 1025)}
+
+# Any value containing one of these characters must be escaped and/or quoted.
+_NEEDS_PROCESSING = re.compile(r'[" \n=]').search
+
+# Any value containing a space or equals sign must be quoted.
+_NEEDS_QUOTE = re.compile(r"[ =]").search
+
 
 class Logfmter(logging.Formatter):
     @classmethod
@@ -45,20 +65,17 @@ class Logfmter(logging.Formatter):
         """
         Process the provided string with any necessary quoting and/or escaping.
         """
-        needs_dquote_escaping = '"' in value
-        needs_newline_escaping = "\n" in value
-        needs_quoting = " " in value or "=" in value
-
-        if needs_dquote_escaping:
-            value = value.replace('"', '\\"')
+        # Most values contain no special characters, so return them after a single
+        # scan without escaping or quoting.
+        if not _NEEDS_PROCESSING(value):
+            return value if value else '""'
 
-        if needs_newline_escaping:
-            value = value.replace("\n", "\\n")
+        escaped = value.translate(_ESCAPE)
 
-        if needs_quoting:
-            value = '"{}"'.format(value)
+        if _NEEDS_QUOTE(value):
+            return f'"{escaped}"'
 
-        return value if value else '""'
+        return escaped
 
     @classmethod
     def format_value(cls, value) -> str:
@@ -67,8 +84,19 @@ class Logfmter(logging.Formatter):
         """
         if value is None:
             return ""
-        elif isinstance(value, bool):
+
+        # Check the concrete type first to avoid the comparatively slow abstract
+        # base class check for the most common values. Note that bool must be
+        # handled before int, because bool is a subclass of int.
+        value_type = type(value)
+
+        if value_type is bool:
             return "true" if value else "false"
+        elif value_type is int:
+            cached = _SMALL_INT_STR.get(value)
+            return cached if cached is not None else str(value)
+        elif value_type is float:
+            return str(value)
         elif isinstance(value, numbers.Number):
             return str(value)
 
@@ -90,12 +118,8 @@ class Logfmter(logging.Formatter):
         """
         _type, exc, tb = exc_info
 
-        with closing(io.StringIO()) as sio:
-            traceback.print_exception(_type, exc, tb, None, sio)
-            value = sio.getvalue()
-
         # Tracebacks have a single trailing newline that we don't need.
-        value = value.rstrip("\n")
+        value = "".join(traceback.format_exception(_type, exc, tb)).rstrip("\n")
 
         return cls.format_string(value)
 
@@ -105,10 +129,7 @@ class Logfmter(logging.Formatter):
         Return a string representing the logfmt formatted parameters.
         """
         return " ".join(
-            [
-                "{}={}".format(key, cls.format_value(value))
-                for key, value in params.items()
-            ]
+            f"{key}={cls.format_value(value)}" for key, value in params.items()
         )
 
     @classmethod
@@ -127,7 +148,11 @@ class Logfmter(logging.Formatter):
         if not key:
             return "_"
 
-        return key.replace(" ", "_").replace("\n", "\\n")
+        # Most keys are attribute names or identifiers which never need normalizing.
+        if " " not in key and "\n" not in key:
+            return key
+
+        return key.translate(_KEY_ESCAPE)
 
     @classmethod
     def get_extra(cls, record: logging.LogRecord) -> dict:
@@ -137,7 +162,7 @@ class Logfmter(logging.Formatter):
         return {
             cls.normalize_key(key): value
             for key, value in record.__dict__.items()
-            if key not in RESERVED
+            if key not in _RESERVED
         }
 
     def __init__(
@@ -145,22 +170,82 @@ class Logfmter(logging.Formatter):
         keys: List[str] = ["at"],
         mapping: Dict[str, str] = {"at": "levelname"},
         datefmt: Optional[str] = None,
+        assume_clean_keys: bool = False,
     ):
-        self.keys = [self.normalize_key(key) for key in keys]
-        self.mapping = {
+        self._keys = [self.normalize_key(key) for key in keys]
+        self._mapping = {
             self.normalize_key(key): value for key, value in mapping.items()
         }
+        self._build_key_plan()
+
         self.datefmt = datefmt
+        self.assume_clean_keys = assume_clean_keys
+
+        # Bind the hot path classmethods once, so that formatting a record doesn't
+        # resolve the classmethod descriptors on every call. They are looked up on the
+        # instance's class to respect any subclass overrides.
+        cls = type(self)
+        self._format_value = cls.format_value
+        self._normalize_key = cls.normalize_key
+
+    @property
+    def keys(self) -> List[str]:
+        """
+        The default keys included in every log message.
+
+        Assign a new list, rather than modifying this one in place, so that the
+        formatter picks up the change.
+        """
+        return self._keys
+
+    @keys.setter
+    def keys(self, keys: List[str]) -> None:
+        self._keys = [self.normalize_key(key) for key in keys]
+        self._build_key_plan()
+
+    @property
+    def mapping(self) -> Dict[str, str]:
+        """
+        The mapping of default keys to their log record attributes.
+
+        Assign a new dictionary, rather than modifying this one in place, so that the
+        formatter picks up the change.
+        """
+        return self._mapping
+
+    @mapping.setter
+    def mapping(self, mapping: Dict[str, str]) -> None:
+        self._mapping = {
+            self.normalize_key(key): value for key, value in mapping.items()
+        }
+        self._build_key_plan()
+
+    def _build_key_plan(self) -> None:
+        """
+        Resolve each default key's log record attribute once, instead of on every
+        formatted record. This must be called whenever the keys or mapping change.
+        """
+        self._key_plan: List[Tuple[str, str]] = [
+            (key, self._mapping.get(key, key)) for key in self._keys
+        ]
+        self._needs_asctime = any(
+            attribute == "asctime" for _, attribute in self._key_plan
+        )
 
     def format(self, record: logging.LogRecord) -> str:
         # If the 'asctime' attribute will be used, then generate it.
-        if "asctime" in self.keys or "asctime" in self.mapping.values():
+        if self._needs_asctime:
             record.asctime = self.formatTime(record, self.datefmt)
 
         if isinstance(record.msg, dict):
-            params = {
-                self.normalize_key(key): value for key, value in record.msg.items()
-            }
+            # The msg dictionary is copied, because the extra parameters are added to
+            # params below and the caller's dictionary must not be modified.
+            if self.assume_clean_keys:
+                params = dict(record.msg)
+            else:
+                params = {
+                    self._normalize_key(key): value for key, value in record.msg.items()
+                }
         else:
             params = {"msg": record.getMessage()}
 
@@ -174,27 +259,19 @@ class Logfmter(logging.Formatter):
         # values for these keys must already exist on the log record. If they are
         # available under a different attribute name, then the formatter's mapping will
         # be used to lookup these attributes. e.g. 'at' from 'levelname'
-        for key in self.keys:
-
-            attribute = key
-
-            # If there is a mapping for this key's attribute, then use it to lookup
-            # the key's value.
-            if key in self.mapping:
-                attribute = self.mapping[key]
-
+        for key, attribute in self._key_plan:
             # If this key is in params, then skip it, because it was manually passed in
             # will be added via the params system.
             if attribute in params:
                 continue
 
+            value = getattr(record, attribute, _MISSING)
+
             # If the attribute doesn't exist on the log record, then skip it.
-            if not hasattr(record, attribute):
+            if value is _MISSING:
                 continue
 
-            value = getattr(record, attribute)
-
-            tokens.append("{}={}".format(key, self.format_value(value)))
+            tokens.append(f"{key}={self._format_value(value)}")
 
         formatted_params = self.format_params(params)
         if formatted_params:
@@ -204,6 +281,17 @@ class Logfmter(logging.Formatter):
             # Cast exc_info to its not null variant to make mypy happy.
             exc_info = cast(ExcInfo, record.exc_info)
 
-            tokens.append("exc_info={}".format(self.format_exc_info(exc_info)))
+            tokens.append(f"exc_info={self.format_exc_info(exc_info)}")
 
         return " ".join(tokens)
+
+    def format_records(self, records: Iterable[logging.LogRecord]) -> str:
+        """
+        Return the provided log records formatted as newline separated logfmt lines.
+
+        This is intended for handlers which emit records in batches. The bound format
+        method is resolved once rather than once per record.
+        """
+        format = self.format
+
+        return "\n".join([format(record) for record in records])
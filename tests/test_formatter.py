@@ -2,6 +2,8 @@ import logging
 import re
 import sys
 from datetime import datetime
+from decimal import Decimal
+from unittest import mock
 
 import pytest
 
@@ -25,6 +27,8 @@ from logfmter.formatter import Logfmter
         # If the string contains a newline, then it should be escaped.
         ("\n", "\\n"),
         ("\n\n", "\\n\\n"),
+        # Escaping and quoting should both be applied in a single pass.
+        ('a "b"\nc', '"a \\"b\\"\\nc"'),
     ],
 )
 def test_format_string(value, expected):
@@ -42,6 +46,10 @@ def test_format_string(value, expected):
         (False, "false"),
         # Numbers will be converted to their string representation.
         (1, "1"),
+        (-1, "-1"),
+        (100000, "100000"),
+        (1.5, "1.5"),
+        (Decimal("1.50"), "1.50"),
         # Strings will be passed through the `format_string` function.
         ("=", '"="'),
         # Objects will be converted to their string representation using `str`.
@@ -131,6 +139,9 @@ def test_get_extra(record, expected):
             },
             'at=INFO msg=alpha exc_info="Exception: alpha"',
         ),
+        # If the default key's attribute is manually passed in, then it should only
+        # be added via the params.
+        ({"levelname": "INFO", "msg": {"levelname": "x"}}, "levelname=x"),
         # If, for some odd reason, someone passes in an empty msg dictionary. It
         # should be properly formatted without extra spaces.
         ({"levelname": "INFO", "msg": {}}, "at=INFO"),
@@ -169,6 +180,14 @@ def test_format_default(record, expected):
             {"levelname": "INFO", "msg": {"a": 1}},
             "at=INFO a=1",
         ),
+        # If a provided key's attribute exists but is None, then that key should
+        # still be included in the final params.
+        (
+            ["at", "stack_info"],
+            None,
+            {"levelname": "INFO", "msg": {"a": 1}},
+            "at=INFO stack_info= a=1",
+        ),
         # A user should be able to specify no default keys.
         (
             [],
@@ -266,3 +285,153 @@ def test_extra_keys(record):
     assert (
         Logfmter(keys=["at", "attr"]).format(record) == "at=INFO msg=alpha attr=value"
     )
+
+
+def test_format_records():
+    """
+    When formatting a batch of records, each record should be formatted on its own line.
+    """
+    records = [
+        logging.makeLogRecord({"levelname": "INFO", "msg": "alpha"}),
+        logging.makeLogRecord({"levelname": "ERROR", "msg": {"a": 1}}),
+    ]
+
+    assert Logfmter().format_records(records) == "at=INFO msg=alpha\nat=ERROR a=1"
+
+
+def test_format_assume_clean_keys():
+    """
+    If a user guarantees their msg keys are clean, then the keys should not be
+    normalized and the msg dictionary should not be modified.
+    """
+    # This key breaks the assume_clean_keys contract. It is only used to show that
+    # normalization is skipped, the resulting output is not supported logfmt.
+    msg = {"first name": "josh"}
+    record = logging.makeLogRecord({"levelname": "INFO", "msg": msg, "a": 1})
+
+    value = Logfmter(assume_clean_keys=True).format(record)
+
+    assert value == "at=INFO first name=josh a=1"
+    assert msg == {"first name": "josh"}
+
+
+def test_format_value_override():
+    """
+    If a subclass overrides a formatting classmethod, then that override should be
+    used when formatting records.
+    """
+
+    class CustomLogfmter(Logfmter):
+        @classmethod
+        def format_value(cls, value):
+            if isinstance(value, bool):
+                return "yes" if value else "no"
+
+            return super().format_value(value)
+
+    record = logging.makeLogRecord({"levelname": "INFO", "msg": {"a": True}})
+
+    assert CustomLogfmter().format(record) == "at=INFO a=yes"
+
+
+def test_get_extra_override():
+    """
+    If a subclass overrides `get_extra`, then that override should be used to provide
+    the logger extra parameters.
+    """
+
+    class CustomLogfmter(Logfmter):
+        @classmethod
+        def get_extra(cls, record):
+            return {"x": 1}
+
+    record = logging.makeLogRecord({"levelname": "INFO", "msg": "hi", "foo": 2})
+
+    assert CustomLogfmter().format(record) == "at=INFO msg=hi x=1"
+
+
+def test_format_default_missing_levelname():
+    """
+    If a record is missing the default key's attribute, then that key should be
+    skipped instead of raising an exception.
+    """
+    record = logging.makeLogRecord({"msg": "hi"})
+    del record.levelname
+
+    assert Logfmter().format(record) == "msg=hi"
+
+
+def test_format_params_override():
+    """
+    If a subclass overrides `format_params`, then that override should be used to
+    format the params.
+    """
+
+    class CustomLogfmter(Logfmter):
+        @classmethod
+        def format_params(cls, params):
+            return "P"
+
+    record = logging.makeLogRecord({"levelname": "INFO", "msg": "hi", "foo": 2})
+
+    assert CustomLogfmter().format(record) == "at=INFO P"
+
+
+def test_get_extra_patched():
+    """
+    If `get_extra` is patched on the formatter class, then the patched implementation
+    should be used to provide the logger extra parameters.
+    """
+    record = logging.makeLogRecord({"levelname": "INFO", "msg": "hi", "foo": 2})
+
+    with mock.patch.object(
+        Logfmter, "get_extra", classmethod(lambda cls, record: {"x": 1})
+    ):
+        assert Logfmter().format(record) == "at=INFO msg=hi x=1"
+
+
+def test_format_params_patched():
+    """
+    If `format_params` is patched on the formatter class, then the patched
+    implementation should be used to format the params.
+    """
+    record = logging.makeLogRecord({"levelname": "INFO", "msg": "hi", "foo": 2})
+
+    with mock.patch.object(
+        Logfmter, "format_params", classmethod(lambda cls, params: "P")
+    ):
+        assert Logfmter().format(record) == "at=INFO P"
+
+
+def test_keys_and_mapping_assignment():
+    """
+    If the keys or mapping are assigned after construction, then the new values should
+    be used when formatting records.
+    """
+    record = logging.makeLogRecord({"levelname": "INFO", "levelno": 20, "msg": "hi"})
+
+    formatter = Logfmter()
+    formatter.keys = ["at", "levelno"]
+
+    assert formatter.format(record) == "at=INFO levelno=20 msg=hi"
+
+    formatter.mapping = {"at": "levelno"}
+
+    assert formatter.format(record) == "at=20 levelno=20 msg=hi"
+
+
+def test_keys_and_mapping_subclass_assignment():
+    """
+    If a subclass assigns the keys and mapping after calling `super().__init__()`, then
+    those values should be used when formatting records.
+    """
+
+    class CustomLogfmter(Logfmter):
+        def __init__(self):
+            super().__init__()
+            self.keys = ["lvl"]
+            self.mapping = {"lvl": "levelname"}
+
+    record = logging.makeLogRecord({"levelname": "INFO", "msg": "hi"})
+
+    assert CustomLogfmter().format(record) == "lvl=INFO msg=hi"